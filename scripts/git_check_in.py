@@ -1,98 +1,468 @@
 #!/usr/bin/env python3
+import os
+import re
+import shlex
+import shutil
 import subprocess
 import sys
 import atexit
+import functools
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Absolute path of the git executable, so each spawn skips the PATH search
+GIT = shutil.which("git") or "git"
 
 # Track the feature branch for cleanup
 pushed_branch = None
 
+# Bumped by every git command that may change the index, HEAD or refs;
+# queries memoised with @cached_per_generation recompute when it moves
+_git_generation = 0
+
+# (git dir, common git dir) as absolute paths, resolved once
+_git_dirs = None
+
+# Long-lived `git cat-file --batch-check` helper, started on first use
+_cat_file = None
+
+# Per-thread pygit2.Repository, used for read-only ref queries when pygit2 is installed
+_pygit2_local = threading.local()
+
+# Ancestry answers keyed by (develop OID, branch OID); commits never change
+_ancestor_cache = {}
+
+# Commit counts of HEAD not in origin/develop, keyed by (HEAD OID, origin/develop OID)
+_ahead_count_cache = {}
+
+# Background fetch thread started once main() finds changes, and its result
+_warmup = None
+_develop_fetch = None
+
+# Git subcommands that can change the index, HEAD, refs or working tree
+MUTATING_COMMANDS = {
+    "add", "commit", "merge", "checkout", "switch", "pull", "stash", "reset", "clean", "tag", "push",
+}
+
+# Conventional Commits types, offered as menu entries 1..N
+COMMIT_TYPES = (
+    ("feat", "A new feature"),
+    ("fix", "A bug fix"),
+    ("docs", "Documentation only changes"),
+    ("style", "Code style changes (formatting, whitespace, etc.)"),
+    ("refactor", "Code refactoring (neither fixes a bug nor adds a feature)"),
+    ("perf", "Performance improvements"),
+    ("test", "Adding or updating tests"),
+    ("build", "Changes to build system or dependencies"),
+    ("ci", "CI/CD configuration changes"),
+    ("chore", "Other changes (maintenance, tooling, etc.)"),
+    ("revert", "Reverting a previous commit"),
+)
+
+# A valid first line: type(optional scope)!: description
+COMMIT_HEADER_RE = re.compile(
+    r"^(?:" + "|".join(type_name for type_name, _ in COMMIT_TYPES) + r")(?:\([^()]+\))?!?: \S"
+)
+
+COMMIT_TEMPLATE = (
+    "type(scope): description\n"
+    "\n"
+    "# Write a Conventional Commits message. Lines starting with '#' are ignored,\n"
+    "# and an empty message aborts the commit.\n"
+    "#\n"
+    "# First line: type(scope): description   (the scope is optional)\n"
+    "# Then an optional body and footers (e.g. 'Closes #123', 'BREAKING CHANGE: ...'),\n"
+    "# each separated by a blank line.\n"
+    "#\n"
+    "# Types:\n"
+    + "".join(f"#   {type_name:12} - {description}\n" for type_name, description in COMMIT_TYPES)
+)
+
+def git_argv(cmd):
+    """Return cmd with a leading "git" replaced by the resolved GIT path."""
+    if cmd and cmd[0] == "git":
+        return [GIT, *cmd[1:]]
+    return cmd
+
 def cleanup_and_return_to_develop():
     """Always return to develop and pull before exiting."""
     try:
-        current = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True,
-            text=True,
-            check=False
-        ).stdout.strip()
+        current = (run_small(["git", "rev-parse", "--abbrev-ref", "HEAD"]) or b"").strip()
         
-        if current != "develop":
+        if current != b"develop":
             print("\n" + "="*60)
             print("RETURNING TO DEVELOP")
             print("="*60)
-            subprocess.run(["git", "checkout", "develop"], check=False)
+            subprocess.run([GIT, "checkout", "develop"], check=False)
         
         print("Pulling latest from develop...")
-        subprocess.run(["git", "pull", "origin", "develop"], check=False)
+        subprocess.run([GIT, "pull", "origin", "develop"], check=False)
         print("[OK] You are on develop with latest changes.")
     except:
         pass
 
-# Register cleanup function to run on exit
-atexit.register(cleanup_and_return_to_develop)
-
-def run(cmd, check=True, capture_output=False, show_command=True):
-    """Run a command and optionally capture output."""
+def run(cmd, check=True, capture_output=False, show_command=True, text=True):
+    """Run a command and optionally capture output (as bytes when text is False)."""
     if show_command:
         print(f"$ {' '.join(cmd)}")
     result = subprocess.run(
-        cmd,
+        git_argv(cmd),
         check=False,
-        text=True,
+        text=text,
         capture_output=capture_output,
     )
+    invalidate_caches_after(cmd)
     if check and result.returncode != 0:
         if capture_output:
-            print(result.stdout)
-            print(result.stderr, file=sys.stderr)
+            stdout, stderr = result.stdout, result.stderr
+            if not text:
+                stdout = stdout.decode(errors="replace")
+                stderr = stderr.decode(errors="replace")
+            print(stdout)
+            print(stderr, file=sys.stderr)
         sys.exit(result.returncode)
     return result
 
+def run_small(cmd):
+    """
+    Run a quiet command whose output is known to be tiny and return its stdout
+    as bytes. Returns None if the command fails.
+    """
+    r = subprocess.run(git_argv(cmd), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return r.stdout if r.returncode == 0 else None
+
+def stage_files(files):
+    """Stage files by streaming NUL-separated paths to `git add` instead of argv."""
+    cmd = ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"]
+    print(f"$ {' '.join(cmd)}  # {len(files)} path(s)")
+    p = subprocess.Popen(git_argv(cmd), stdin=subprocess.PIPE)
+    p.communicate(b"\0".join(os.fsencode(f) for f in files))
+    invalidate_caches_after(cmd)
+    if p.returncode != 0:
+        sys.exit(p.returncode)
+
+def probe(cmd):
+    """Run a read-only command for its exit status alone, discarding all output."""
+    return subprocess.call(git_argv(cmd), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def invalidate_caches_after(cmd):
+    """Start a new git generation if cmd may have changed the index, HEAD or refs."""
+    global _git_generation
+    if len(cmd) > 1 and cmd[0] == "git" and cmd[1] in MUTATING_COMMANDS:
+        _git_generation += 1
+
+def cached_per_generation(func):
+    """Memoise a zero-argument git query until the next mutating git command."""
+    # A single (generation, value) pair, replaced in one assignment so a
+    # concurrent reader never sees a value tagged with the wrong generation
+    cache = [None]
+    
+    @functools.wraps(func)
+    def wrapper():
+        generation = _git_generation
+        entry = cache[0]
+        if entry is None or entry[0] != generation:
+            entry = (generation, func())
+            cache[0] = entry
+        return entry[1]
+    return wrapper
+
+class GitCatFile:
+    """A single `git cat-file --batch-check` process answering object lookups over a pipe."""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [GIT, "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+
+    def close(self):
+        """Close the pipe so git exits, then reap it."""
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+        self.proc.stdout.close()
+
+    def resolve(self, name):
+        """Return the object ID that name points to, or None if it does not exist."""
+        self.proc.stdin.write(name + "\n")
+        self.proc.stdin.flush()
+        fields = self.proc.stdout.readline().split()
+        if len(fields) != 2 or fields[1] not in ("commit", "tree", "blob", "tag"):
+            return None
+        return fields[0]
+
+def get_cat_file():
+    """Return the shared GitCatFile, starting it on first use."""
+    global _cat_file
+    if _cat_file is None:
+        _cat_file = GitCatFile()
+        atexit.register(_cat_file.close)
+    return _cat_file
+
+def get_git_dirs():
+    """
+    Return (git dir, common git dir, work-tree root). The first two differ only
+    inside a linked worktree.
+    """
+    global _git_dirs
+    if _git_dirs is None:
+        out = run_small(["git", "rev-parse", "--git-dir", "--git-common-dir", "--show-toplevel"])
+        if out is None:
+            # Only reachable outside a repository, which main() reports itself
+            sys.exit(1)
+        _git_dirs = tuple(os.path.abspath(os.fsdecode(line)) for line in out.splitlines())
+    return _git_dirs
+
+def uses_reftable():
+    """Check whether refs live in a reftable instead of packed-refs and loose files."""
+    return os.path.isdir(os.path.join(get_git_dirs()[1], "reftable"))
+
+@cached_per_generation
+def get_packed_refs():
+    """Return {refname: OID} parsed from packed-refs."""
+    refs = {}
+    try:
+        with open(os.path.join(get_git_dirs()[1], "packed-refs")) as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                oid, _, ref = line.rstrip("\n").partition(" ")
+                refs[ref] = oid
+    except FileNotFoundError:
+        pass
+    return refs
+
+def get_repo():
+    """Return this thread's pygit2.Repository, or None when pygit2 is unavailable."""
+    if pygit2 is None:
+        return None
+    if not hasattr(_pygit2_local, "repo"):
+        try:
+            _pygit2_local.repo = pygit2.Repository(get_git_dirs()[0])
+        except pygit2.GitError:
+            _pygit2_local.repo = None
+    return _pygit2_local.repo
+
+def read_ref_oid(ref):
+    """Return the OID a ref points to, reading the ref files directly when possible."""
+    repo = get_repo()
+    if repo is not None:
+        reference = repo.references.get(ref)
+        return None if reference is None else str(reference.resolve().target)
+    if uses_reftable():
+        return get_cat_file().resolve(ref)
+    try:
+        with open(os.path.join(get_git_dirs()[1], ref)) as f:
+            value = f.read().strip()
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return get_packed_refs().get(ref)
+    if value.startswith("ref: "):
+        # Symbolic refs are rare for branches; let git follow them
+        return get_cat_file().resolve(ref)
+    return value
+
+@cached_per_generation
+def get_local_branches():
+    """
+    Return local branch names. Uses pygit2 when it is installed, streams
+    for-each-ref on reftable repositories, and otherwise reads packed-refs and
+    the loose refs/heads files directly.
+    """
+    common_dir = get_git_dirs()[1]
+    repo = get_repo()
+    if repo is not None:
+        return frozenset(repo.branches.local)
+    if uses_reftable():
+        # No files to read with the reftable backend; stream the names from git instead
+        with subprocess.Popen(
+            git_argv(["git", "for-each-ref", "--format=%(refname:lstrip=2)", "refs/heads/"]),
+            stdout=subprocess.PIPE,
+            text=True,
+        ) as proc:
+            return frozenset(line.rstrip("\n") for line in proc.stdout)
+    
+    names = {ref[len("refs/heads/"):] for ref in get_packed_refs() if ref.startswith("refs/heads/")}
+    
+    heads_dir = os.path.join(common_dir, "refs", "heads")
+    for dirpath, _, filenames in os.walk(heads_dir):
+        prefix = os.path.relpath(dirpath, heads_dir).replace(os.sep, "/")
+        for name in filenames:
+            if name.endswith(".lock"):
+                continue
+            names.add(name if prefix == "." else f"{prefix}/{name}")
+    return frozenset(names)
+
+def develop_fetch_cmd():
+    """Return the command that fetches origin/develop (and changed submodules)."""
+    cmd = ["git", "fetch", "--prune", "--no-tags"]
+    if os.path.exists(os.path.join(get_git_dirs()[2], ".gitmodules")):
+        cmd += ["--recurse-submodules=on-demand", "--jobs=8"]
+    return cmd + ["origin", "develop"]
+
+def start_warmup():
+    """Fetch origin/develop on a thread while the user types the branch name."""
+    global _warmup
+    _warmup = threading.Thread(target=_warm_up, daemon=True)
+    _warmup.start()
+
+def _warm_up():
+    global _develop_fetch
+    # The terminal belongs to the main thread's prompts, so the background fetch
+    # must fail rather than ask for credentials; wait_for_develop_fetch retries it
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    env["GIT_SSH_COMMAND"] = os.environ.get("GIT_SSH_COMMAND", "ssh") + " -o BatchMode=yes"
+    _develop_fetch = subprocess.run(
+        git_argv(develop_fetch_cmd()),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+
+def wait_for_develop_fetch():
+    """
+    Wait for the background fetch; returns True if origin/develop is fresh.
+    A failed background fetch is retried in the foreground, where git may prompt.
+    """
+    global _warmup, _develop_fetch, _git_generation
+    if _warmup is not None:
+        _warmup.join()
+        _warmup = None
+        # The fetch moved refs/remotes/origin/develop; drop any status read before it landed
+        _git_generation += 1
+        if _develop_fetch is not None and _develop_fetch.returncode != 0:
+            print("[WARNING] Background fetch of origin/develop failed; retrying in the foreground...")
+            _develop_fetch = run(develop_fetch_cmd(), check=False)
+            if _develop_fetch.returncode != 0:
+                print("[ERROR] git fetch origin develop failed.")
+    return _develop_fetch is None or _develop_fetch.returncode == 0
+
+@dataclass
+class StatusSnapshot:
+    """Parsed result of one `git status --porcelain=v2 --branch` call."""
+    branch: str
+    oid: str = None
+    upstream: str = None
+    ahead: int = None
+    behind: int = None
+    files: list = field(default_factory=list)  # (XY, path) pairs
+    conflicts: bool = False
+
+# XY codes of unmerged ("u") porcelain v2 records
+UNMERGED_CODES = {"DD", "AU", "UD", "UA", "DU", "AA", "UU"}
+
+# Number of space-separated fields before the path in each porcelain v2 record type
+_PATH_FIELD = {b"1": 8, b"2": 9, b"u": 10}
+
+def parse_status_v2(output):
+    """Parse NUL-separated porcelain v2 output (bytes) into a StatusSnapshot."""
+    snapshot = StatusSnapshot(branch="HEAD")
+    records = iter(output.split(b"\0"))
+    for record in records:
+        kind = record[:1]
+        if kind == b"#":
+            if record.startswith(b"# branch.oid "):
+                oid = record[13:].decode()
+                snapshot.oid = None if oid == "(initial)" else oid
+            elif record.startswith(b"# branch.head "):
+                head = record[14:].decode()
+                snapshot.branch = "HEAD" if head == "(detached)" else head
+            elif record.startswith(b"# branch.upstream "):
+                snapshot.upstream = record[18:].decode()
+            elif record.startswith(b"# branch.ab "):
+                ahead, behind = record[12:].split()
+                snapshot.ahead = int(ahead)
+                snapshot.behind = -int(behind)
+        elif kind in _PATH_FIELD:
+            fields = record.split(b" ", _PATH_FIELD[kind])
+            snapshot.files.append((fields[1].decode(), os.fsdecode(fields[-1])))
+            if kind == b"2":
+                # Renames are followed by a record holding the original path
+                next(records, None)
+            elif kind == b"u":
+                snapshot.conflicts = True
+        elif kind == b"?":
+            snapshot.files.append(("??", os.fsdecode(record[2:])))
+        elif kind == b"!":
+            snapshot.files.append(("!!", os.fsdecode(record[2:])))
+    return snapshot
+
+@cached_per_generation
+def get_status():
+    """Return the StatusSnapshot for the current index, HEAD and working tree."""
+    r = run(
+        ["git", "status", "--porcelain=v2", "--branch", "-z", "--untracked-files=all"],
+        check=False,
+        capture_output=True,
+        show_command=False,
+        text=False
+    )
+    if r.returncode != 0:
+        # Prefetches on worker threads fail quietly; the main thread's call reports it
+        if threading.current_thread() is threading.main_thread():
+            print(r.stderr.decode(errors="replace"), end="", file=sys.stderr)
+        sys.exit(r.returncode)
+    return parse_status_v2(r.stdout)
+
 def get_current_branch():
     """Get the current Git branch name."""
-    r = run(["git", "rev-parse", "--abbrev-ref", "HEAD"], capture_output=True, show_command=False)
-    return r.stdout.strip()
+    return get_status().branch
 
 def has_merge_conflicts():
     """Check if there are merge conflicts in the working directory."""
-    r = run(["git", "status", "--porcelain"], check=False, capture_output=True, show_command=False)
-    for line in r.stdout.splitlines():
-        if line.startswith(("UU", "AA", "DD")):
-            return True
-    return False
+    return get_status().conflicts
 
 def list_changed_files():
     """List modified/added files (excluding deletions and ignored files)."""
-    r = run(["git", "status", "--porcelain"], capture_output=True, show_command=False)
     files = []
-    for line in r.stdout.splitlines():
-        status = line[0:2]
-        path = line[3:]
-        if "D" in status:
+    for status, path in get_status().files:
+        if "D" in status or status == "!!":
             continue
         files.append(path)
     return files
 
+def merge_in_progress():
+    """Check for a stopped merge via MERGE_HEAD, without running git."""
+    return os.path.exists(os.path.join(get_git_dirs()[0], "MERGE_HEAD"))
+
+def print_file_list(files):
+    """Print files as an indented bullet list with a single write."""
+    sys.stdout.write("".join(f"  - {f}\n" for f in files))
+
 def has_any_changes_from_develop():
     """
     Check if there are any uncommitted or committed changes compared to develop.
     Returns True if there are changes, False if working tree matches develop exactly.
     """
-    status_result = run(["git", "status", "--porcelain"], capture_output=True, show_command=False)
-    if status_result.stdout.strip():
+    if get_status().files:
         return True
     
-    current_branch = get_current_branch()
-    run(["git", "fetch", "origin", "develop"], capture_output=True, show_command=False, check=False)
-    
-    diff_result = run(
-        ["git", "diff", "--quiet", "origin/develop", "HEAD"],
-        check=False,
-        capture_output=True,
-        show_command=False
-    )
-    
-    return diff_result.returncode != 0
+    # Compare against the local origin/develop; the background fetch need not finish first
+    return count_commits_ahead_of_develop() != 0
+
+def count_commits_ahead_of_develop():
+    """Count commits on HEAD that origin/develop lacks; None if either is missing."""
+    head_oid = get_status().oid
+    develop_oid = read_ref_oid("refs/remotes/origin/develop")
+    if head_oid is None or develop_oid is None:
+        return None
+    
+    key = (head_oid, develop_oid)
+    if key not in _ahead_count_cache:
+        out = run_small(["git", "rev-list", "--count", f"{develop_oid}..{head_oid}"])
+        _ahead_count_cache[key] = None if out is None else int(out)
+    return _ahead_count_cache[key]
 
 def safe_checkout(branch_name, create_new=False):
     """
@@ -102,7 +472,8 @@ def safe_checkout(branch_name, create_new=False):
     cmd = ["git", "checkout", "-b", branch_name] if create_new else ["git", "checkout", branch_name]
     
     print(f"$ {' '.join(cmd)}")
-    result = subprocess.run(cmd, check=False, text=True, capture_output=True)
+    result = subprocess.run(git_argv(cmd), check=False, text=True, capture_output=True)
+    invalidate_caches_after(cmd)
     
     if result.returncode == 0:
         print(result.stdout, end='')
@@ -119,12 +490,11 @@ def safe_checkout(branch_name, create_new=False):
         
         if changed_files:
             print("\nFiles with uncommitted changes:")
-            for f in changed_files:
-                print(f"  - {f}")
+            print_file_list(changed_files)
         
         print("\nWhat do you want to do?")
         print("1. Commit these files (will continue with check-in)")
-        print("2. Stash these changes temporarily")
+        print("2. Carry these changes over with a merge (stash them if the switch fails)")
         print("3. Add to .gitignore and discard (*** DESTRUCTIVE ***)")
         print("4. Abort")
         
@@ -137,6 +507,25 @@ def safe_checkout(branch_name, create_new=False):
                 return "skip_checkout"
             
             elif choice == "2":
+                # A merging switch carries clean changes over in one step
+                merge_cmd = ["git", "checkout", "--merge", *cmd[2:]]
+                print(f"$ {' '.join(merge_cmd)}")
+                merged = subprocess.run(git_argv(merge_cmd), check=False, text=True, capture_output=True)
+                invalidate_caches_after(merge_cmd)
+                if merged.returncode == 0:
+                    print(merged.stdout, end='')
+                    if has_merge_conflicts():
+                        conflicted = [path for xy, path in get_status().files if xy in UNMERGED_CODES]
+                        print(f"[ERROR] Your changes conflict with '{branch_name}'; they are kept in the conflict markers.")
+                        print("Resolve the conflicts, then re-run this script.")
+                        # After a merging checkout, stage 3 ("theirs") holds the working-tree version
+                        print("To throw away the markers and keep your local version instead:")
+                        paths = " ".join(shlex.quote(p) for p in conflicted)
+                        print(f"  git checkout --theirs -- {paths} && git reset -q -- {paths}")
+                        sys.exit(1)
+                    print("[OK] Checkout successful. Your changes were carried over.")
+                    return True
+                
                 print("\n=== Attempting to stash changes ===")
                 stash_result = run(
                     ["git", "stash", "push", "-m", "Auto-stash by check-in script"],
@@ -146,7 +535,8 @@ def safe_checkout(branch_name, create_new=False):
                 
                 if stash_result.returncode == 0:
                     print("[OK] Changes stashed successfully")
-                    retry = subprocess.run(cmd, check=False, text=True, capture_output=True)
+                    retry = subprocess.run(git_argv(cmd), check=False, text=True, capture_output=True)
+                    invalidate_caches_after(cmd)
                     if retry.returncode == 0:
                         print(retry.stdout, end='')
                         print("[OK] Checkout successful. Your changes are in stash.")
@@ -173,20 +563,23 @@ def safe_checkout(branch_name, create_new=False):
                     if add_ignore == "y" and changed_files:
                         try:
                             with open(".gitignore", "a") as f:
-                                f.write("\n# Auto-added by git check-in script\n")
-                                for file in changed_files:
-                                    f.write(f"{file}\n")
+                                f.write("\n# Auto-added by git check-in script\n" + "\n".join(changed_files) + "\n")
                             print("[OK] Files added to .gitignore")
                         except Exception as e:
                             print(f"[WARNING] Could not update .gitignore: {e}")
                     
-                    run(["git", "reset", "--hard", "HEAD"], check=False)
-                    run(["git", "clean", "-fd"], check=False)
-                    print("[OK] Changes discarded")
+                    has_untracked = any(status == "??" for status, _ in get_status().files)
                     
-                    retry = subprocess.run(cmd, check=False, text=True, capture_output=True)
+                    # A forced checkout discards local changes and switches in one pass
+                    force_cmd = ["git", "checkout", "-f", "-B", branch_name] if create_new else ["git", "checkout", "-f", branch_name]
+                    print(f"$ {' '.join(force_cmd)}")
+                    retry = subprocess.run(git_argv(force_cmd), check=False, text=True, capture_output=True)
+                    invalidate_caches_after(force_cmd)
                     if retry.returncode == 0:
                         print(retry.stdout, end='')
+                        if has_untracked:
+                            run(["git", "clean", "-fd"], check=False)
+                        print("[OK] Changes discarded")
                         return True
                     else:
                         print("[ERROR] Checkout still failed:")
@@ -210,29 +603,39 @@ def safe_checkout(branch_name, create_new=False):
 
 def branch_exists(branch_name):
     """Check if a local branch exists."""
-    r = run(["git", "branch", "--list", branch_name], capture_output=True, check=False, show_command=False)
-    return branch_name in r.stdout.split()
+    if get_repo() is None and uses_reftable():
+        # Without ref files to read, one ref lookup is cheaper than listing every branch
+        return probe(["git", "show-ref", "--verify", "--quiet", f"refs/heads/{branch_name}"]) == 0
+    return branch_name in get_local_branches()
 
 def make_unique_branch_name(base_name):
     """Generate unique branch name by appending _1, _2, etc."""
-    if not branch_exists(base_name):
+    existing = get_local_branches()
+    if base_name not in existing:
         return base_name
     i = 1
-    while True:
-        candidate = f"{base_name}_{i}"
-        if not branch_exists(candidate):
-            return candidate
+    while f"{base_name}_{i}" in existing:
         i += 1
+    return f"{base_name}_{i}"
 
 def is_branch_up_to_date_with_develop(branch_name):
     """Check if branch is up to date with develop."""
-    r = run(
-        ["git", "merge-base", "--is-ancestor", "develop", branch_name],
-        check=False,
-        capture_output=True,
-        show_command=False
-    )
-    return r.returncode == 0
+    develop_oid = read_ref_oid("refs/heads/develop")
+    branch_oid = read_ref_oid(f"refs/heads/{branch_name}")
+    if develop_oid is None or branch_oid is None:
+        return False
+    if develop_oid == branch_oid:
+        return True
+    
+    key = (develop_oid, branch_oid)
+    if key not in _ancestor_cache:
+        repo = get_repo()
+        if repo is not None:
+            _ancestor_cache[key] = repo.descendant_of(branch_oid, develop_oid)
+        else:
+            # merge-base reads generation numbers from the commit-graph when one exists
+            _ancestor_cache[key] = probe(["git", "merge-base", "--is-ancestor", develop_oid, branch_oid]) == 0
+    return _ancestor_cache[key]
 
 def sync_branch_with_develop(branch_name):
     """Sync given branch with develop by merging develop into it."""
@@ -248,7 +651,7 @@ def sync_branch_with_develop(branch_name):
     result = run(["git", "merge", "develop"], check=False, capture_output=True)
     
     if result.returncode != 0:
-        if has_merge_conflicts():
+        if merge_in_progress():
             print("\n[ERROR] Merge conflicts detected while syncing with develop.")
             print("Resolve conflicts manually:")
             print("  1. Fix conflicts in the files")
@@ -264,89 +667,73 @@ def sync_branch_with_develop(branch_name):
     print(f"[OK] Branch '{branch_name}' is now up to date with develop")
 
 def get_conventional_commit_message():
-    """Get a commit message following Conventional Commits specification."""
-    
-    commit_types = {
-        "1": ("feat", "A new feature"),
-        "2": ("fix", "A bug fix"),
-        "3": ("docs", "Documentation only changes"),
-        "4": ("style", "Code style changes (formatting, whitespace, etc.)"),
-        "5": ("refactor", "Code refactoring (neither fixes a bug nor adds a feature)"),
-        "6": ("perf", "Performance improvements"),
-        "7": ("test", "Adding or updating tests"),
-        "8": ("build", "Changes to build system or dependencies"),
-        "9": ("ci", "CI/CD configuration changes"),
-        "10": ("chore", "Other changes (maintenance, tooling, etc.)"),
-        "11": ("revert", "Reverting a previous commit"),
-    }
-    
-    print("\n=== Conventional Commit Message ===")
-    print("Select commit type:")
-    for key, (type_name, description) in commit_types.items():
-        print(f"  {key}. {type_name:12} - {description}")
-    
-    while True:
-        choice = input("\nEnter your choice (1-11): ").strip()
-        if choice in commit_types:
-            commit_type = commit_types[choice][0]
-            break
-        print("Invalid choice. Please enter a number between 1 and 11.")
-    
-    print(f"\nCommit type: {commit_type}")
-    scope = input("Enter scope (optional, e.g., 'api', 'ui', 'auth'): ").strip()
-    
-    while True:
-        description = input("Enter short description (required): ").strip()
-        if description:
-            break
-        print("Description cannot be empty.")
-    
-    if scope:
-        header = f"{commit_type}({scope}): {description}"
-    else:
-        header = f"{commit_type}: {description}"
+    """
+    Get a commit message following Conventional Commits specification.
+    The user edits a pre-filled template in their editor; an invalid message
+    reopens the same file so nothing typed is lost.
+    """
+    # git var applies git's own precedence: GIT_EDITOR, core.editor, VISUAL, EDITOR, vi
+    editor = shlex.split(os.fsdecode(run_small(["git", "var", "GIT_EDITOR"]) or b"").strip() or "vi")
     
-    print("\nOptional: Add detailed body? (press Enter to skip)")
-    body_lines = []
-    print("(Enter an empty line when done)")
-    while True:
-        line = input()
-        if not line:
-            break
-        body_lines.append(line)
+    with tempfile.NamedTemporaryFile("w", suffix=".COMMIT_EDITMSG", delete=False) as f:
+        f.write(COMMIT_TEMPLATE)
+        path = f.name
     
-    footer_lines = []
-    add_footer = input("\nAdd footer (e.g., 'Closes #123', 'BREAKING CHANGE: ...')? [y/N]: ").strip().lower()
-    if add_footer == "y":
-        print("Enter footer lines (press Enter on empty line when done):")
+    try:
         while True:
-            line = input()
-            if not line:
-                break
-            footer_lines.append(line)
-    
-    commit_msg = header
-    if body_lines:
-        commit_msg += "\n\n" + "\n".join(body_lines)
-    if footer_lines:
-        commit_msg += "\n\n" + "\n".join(footer_lines)
-    
-    print("\n--- Commit Message Preview ---")
-    print(commit_msg)
-    print("------------------------------")
-    
-    confirm = input("\nUse this commit message? [y/N]: ").strip().lower()
-    if confirm != "y":
-        print("Let's try again...")
-        return get_conventional_commit_message()
-    
-    return commit_msg
+            try:
+                editor_failed = subprocess.run(editor + [path], check=False).returncode != 0
+            except OSError:
+                editor_failed = True
+            if editor_failed:
+                print(f"[ERROR] Editor '{' '.join(editor)}' failed. Set core.editor or $GIT_EDITOR to fix this.")
+                sys.exit(1)
+            
+            with open(path) as f:
+                lines = [line.rstrip() for line in f if not line.startswith("#")]
+            commit_msg = re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+            
+            if not commit_msg:
+                print("Aborting commit due to empty commit message.")
+                sys.exit(0)
+            
+            header = commit_msg.split("\n", 1)[0]
+            if not COMMIT_HEADER_RE.match(header):
+                print(f"\n[ERROR] Invalid first line: {header}")
+                print("It must look like 'type(scope): description' using one of the listed types.")
+                input("Press Enter to edit the message again...")
+                continue
+            
+            print("\n--- Commit Message Preview ---")
+            print(commit_msg)
+            print("------------------------------")
+            
+            confirm = input("\nUse this commit message? [y/N]: ").strip().lower()
+            if confirm == "y":
+                return commit_msg
+            print("Let's try again...")
+    finally:
+        os.unlink(path)
 
 def main():
     global pushed_branch
     
-    # Verify we're in a git repository
-    run(["git", "rev-parse", "--is-inside-work-tree"], show_command=False)
+    # Verify we're in a git repository while the read-only startup queries run alongside;
+    # their results land in the caches, and failures are reported by the later main-thread calls
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        in_work_tree = executor.submit(
+            subprocess.run,
+            git_argv(["git", "rev-parse", "--is-inside-work-tree"]),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        executor.submit(get_git_dirs)
+        executor.submit(get_status)
+        check = in_work_tree.result()
+        if check.returncode != 0:
+            print(check.stderr, end='', file=sys.stderr)
+            sys.exit(check.returncode)
 
     current_branch = get_current_branch()
     print(f"Current branch: {current_branch}")
@@ -363,19 +750,16 @@ def main():
         sys.exit(0)
     
     print("[OK] Changes detected. Proceeding with check-in...")
+    
+    # Fetch origin/develop in the background while the checkout and the branch name prompt run
+    start_warmup()
 
-    # STEP 1: Switch to develop and pull latest
+    # STEP 1: Switch to develop
     print("\n=== Updating develop branch ===")
     checkout_result = safe_checkout("develop")
     
     if checkout_result == "skip_checkout":
         print("\n[OK] Staying on current branch to commit your changes.")
-    else:
-        run(["git", "pull", "origin", "develop"])
-        
-        if has_merge_conflicts():
-            print("[ERROR] Merge conflicts detected while updating develop. Resolve them and rerun.")
-            sys.exit(1)
 
     # STEP 2: Get desired branch name from user
     print("\n=== Creating/selecting feature branch ===")
@@ -392,6 +776,30 @@ def main():
             continue
         
         break
+    
+    # Usually already finished while the user was typing
+    fetched = wait_for_develop_fetch()
+    
+    if checkout_result != "skip_checkout":
+        if not fetched:
+            sys.exit(1)
+        # Only a local fast-forward to the fetched origin/develop is left
+        status = get_status()
+        if status.upstream == "origin/develop" and status.behind == 0:
+            print("[OK] develop already up to date")
+        else:
+            result = run(["git", "merge", "--ff-only", "origin/develop"], check=False, capture_output=True)
+            print(result.stdout, end='')
+            
+            if result.returncode != 0:
+                print(result.stderr, file=sys.stderr)
+                # Other failures (e.g. local changes the update would overwrite) are explained by git itself
+                if probe(["git", "merge-base", "--is-ancestor", "develop", "origin/develop"]) != 0:
+                    print("[ERROR] Local develop has diverged from origin/develop and cannot be fast-forwarded.")
+                    print("Reconcile it first, for example:")
+                    print("  git switch develop && git pull --rebase origin develop")
+                    print("then re-run this script.")
+                sys.exit(1)
 
     # STEP 3: Handle existing branch or current branch scenario
     final_branch = desired_branch
@@ -427,6 +835,10 @@ def main():
         # Branch doesn't exist - create it
         safe_checkout(final_branch, create_new=True)
         print(f"[OK] Created and switched to: {final_branch}")
+    
+    # From here on we are off develop, so return to it on any exit. Earlier
+    # exits (no changes, merge conflicts) leave the tree where it is.
+    atexit.register(cleanup_and_return_to_develop)
 
     # STEP 4: List and stage changed files
     print("\n=== Staging files ===")
@@ -437,15 +849,14 @@ def main():
         sys.exit(0)
 
     print("Files to be committed:")
-    for f in files:
-        print(f"  - {f}")
+    print_file_list(files)
 
     ans = input("\nStage these files? [y/N]: ").strip().lower()
     if ans != "y":
         print("Aborting.")
         sys.exit(0)
 
-    run(["git", "add"] + files)
+    stage_files(files)
 
     # STEP 5: Create commit
     commit_msg = get_conventional_commit_message()
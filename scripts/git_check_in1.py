@@ -3,9 +3,16 @@
 
 import argparse
 import re
+import shutil
 import subprocess
 import sys
 
+# Absolute path of the git executable, so each spawn skips the PATH search
+GIT = shutil.which("git") or "git"
+
+# Strict MAJOR.MINOR.PATCH, compiled once; see validate_semver()
+_SEMVER_RE = re.compile(r"\A(?:0|[1-9]\d*)\.(?:0|[1-9]\d*)\.(?:0|[1-9]\d*)\Z")
+
 def run(cmd, check=True, capture=False):
     kwargs = {"check": False, "universal_newlines": True}
     if capture:
@@ -22,7 +29,11 @@ def run(cmd, check=True, capture=False):
     return p
 
 def git(*args, check=True, capture=False):
-    return run(["git"] + list(args), check=check, capture=capture)
+    return run([GIT] + list(args), check=check, capture=capture)
+
+def run_quick(cmd):
+    # For tiny outputs: raw bytes of stdout, stderr dropped, exit status ignored.
+    return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False).stdout
 
 def ensure_clean_worktree():
     r = git("status", "--porcelain", capture=True, check=True)
@@ -34,13 +45,13 @@ def current_branch():
     return (r.stdout or "").strip()
 
 def tag_exists(tag):
-    r = git("rev-parse", "-q", "--verify", "refs/tags/" + tag, check=False, capture=False)
-    return r.returncode == 0
+    # rev-parse prints the tag's object id only when it resolves
+    return bool(run_quick([GIT, "rev-parse", "-q", "--verify", "refs/tags/" + tag]).strip())
 
 def validate_semver(version):
     # SemVer core: X.Y.Z where X,Y,Z are non-negative integers (no leading +/spaces).
     # Keeping it strict per your request; extend if you need -rc.1 / +meta.
-    return re.match(r"^(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)$", version) is not None
+    return _SEMVER_RE.match(version) is not None
 
 def main():
     ap = argparse.ArgumentParser(description="Create/push an annotated SemVer tag from develop only (Python 3.6).")